@@ -9,6 +9,7 @@ Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
 import typing
 
 import JackTokenizer
+from OutputFormats import FORMATS
 
 
 class CompilationEngine:
@@ -18,21 +19,22 @@ class CompilationEngine:
     op = ['=', '+', '-', '/', '|', '~', '^', '#', '*', '&gt;', '&lt;', '&quot;', '&amp;']
     unaryOp = ['-', '~']
 
-    def __init__(self, input_stream: JackTokenizer, output_stream) -> None:
+    def __init__(self, input_stream: JackTokenizer, output_stream, output_format="xml") -> None:
         """
         Creates a new compilation engine with the given input and output. The
         next routine called must be compileClass()
         :param input_stream: The input stream.
-        :param output_stream: The output stream.
+        :param output_stream: The output stream, opened in binary mode for the
+        "bin" format.
+        :param output_format: one of the keys of OutputFormats.FORMATS.
         """
         # Your code goes here!
         # Note that you can write to output_stream like so:
         # output_stream.write("Hello world! \n")
 
         self.tokenizer = input_stream
-        self.output_XML = output_stream
+        self.writer = FORMATS[output_format](output_stream)
         self.advanceT()
-        self.tab_num = 0
         self.compile_class()
 
     def compile_class(self) -> None:
@@ -318,16 +320,13 @@ class CompilationEngine:
             raise ValueError("MY ERROR" + exp_token + " " + self.curr_token[1])
 
     def writeLS(self, label) -> None:
-        self.output_XML.write(" " * self.tab_num + "<" + label + ">\n")
-        self.tab_num = +1
+        self.writer.start(label)
 
     def writeLE(self, label) -> None:
-        self.tab_num = -1
-        self.output_XML.write(" " * self.tab_num + "</" + label + ">\n")
+        self.writer.end(label)
 
-    def writeT(self, token):  ###########
-        self.output_XML.write(
-            " " * self.tab_num + "<" + token[0] + ">" + token[1] + "</" + token[0] + "> \n")  ####??????? tuple
+    def writeT(self, token):
+        self.writer.token(token)
 
     def open_close_brackets_class(self):
         self.eat('{')
@@ -5,35 +5,156 @@ was written by Aviv Yaish. It is an extension to the specifications given
 as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
 Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
 """
+import io
 import os
+import queue
 import sys
+import threading
 import typing
 from CompilationEngine import CompilationEngine
 from JackTokenizer import JackTokenizer
+from OutputFormats import FORMATS
 
 
 def analyze_file(
-        input_file: typing.TextIO, output_file: typing.TextIO) -> None:
+        input_file: typing.TextIO, output_file: typing.IO,
+        output_format: str = "xml") -> None:
     """Analyzes a single file.
 
     Args:
         input_file (typing.TextIO): the file to analyze.
-        output_file (typing.TextIO): writes all output to this file.
+        output_file (typing.IO): writes all output to this file, must be
+            opened in binary mode for the "bin" format.
+        output_format (str): one of the keys of OutputFormats.FORMATS.
     """
     # Your code goes here!
     # It might be good to start by creating a new JackTokenizer and CompilationEngine:
     tokenizer = JackTokenizer(input_file)
-    engine = CompilationEngine(tokenizer, output_file)
+    engine = CompilationEngine(tokenizer, output_file, output_format)
+
+
+# How many files each pipeline stage may run ahead of the next one. This
+# bounds memory to a few sources and outputs, whatever the number of files.
+PIPELINE_DEPTH = 2
+_DONE = None
+
+
+def analyze_files(input_paths: typing.List[str], output_format: str = "xml",
+                  depth: int = PIPELINE_DEPTH) -> None:
+    """Analyzes several files, overlapping disk I/O with parsing.
+
+    A reader thread prefetches the next sources, the calling thread parses
+    them into memory, and a writer thread flushes finished outputs. Both
+    hand-offs are bounded queues of the given depth, so a slow stage blocks
+    the stage before it instead of buffering every file. Files are
+    processed in order and the first error stops the pipeline, after the
+    partial output of the failing file has been written.
+
+    Args:
+        input_paths (typing.List[str]): the .jack files to analyze.
+        output_format (str): one of the keys of OutputFormats.FORMATS.
+        depth (int): the size of the prefetch and write queues, at least 1.
+    """
+    if depth < 1:
+        raise ValueError("pipeline depth must be at least 1, got " + str(depth))
+    if output_format not in FORMATS:
+        raise ValueError("unknown output format " + repr(output_format))
+    sources = queue.Queue(depth)
+    outputs = queue.Queue(depth)
+    stop = threading.Event()
+    write_errors = []
+    reader = threading.Thread(
+        target=_read_sources, args=(input_paths, sources, stop), daemon=True)
+    writer = threading.Thread(
+        target=_write_outputs, args=(outputs, output_format, write_errors),
+        daemon=True)
+    reader.start()
+    writer.start()
+    try:
+        while not write_errors:
+            item = sources.get()
+            if item is _DONE:
+                break
+            input_path, source = item
+            if isinstance(source, BaseException):
+                raise source
+            output = io.BytesIO() if FORMATS[output_format].binary \
+                else io.StringIO()
+            try:
+                analyze_file(io.StringIO(source), output, output_format)
+            finally:
+                outputs.put((output_path_for(input_path, output_format),
+                             output.getvalue()))
+    finally:
+        stop.set()
+        outputs.put(_DONE)
+        writer.join()
+    if write_errors:
+        raise write_errors[0]
+
+
+def output_path_for(input_path: str, output_format: str = "xml") -> str:
+    """Returns the path of the output file for the given input file."""
+    return os.path.splitext(input_path)[0] + "." + output_format
+
+
+def _read_sources(input_paths, sources, stop) -> None:
+    """Prefetch stage: reads the sources and queues them for parsing."""
+    for input_path in input_paths:
+        try:
+            with open(input_path, 'r') as input_file:
+                item = (input_path, input_file.read())
+        except BaseException as error:  # forwarded, or the parser waits forever
+            item = (input_path, error)
+        if not _put_unless_stopped(sources, item, stop) \
+                or isinstance(item[1], BaseException):
+            return
+    _put_unless_stopped(sources, _DONE, stop)
+
+
+def _put_unless_stopped(sources, item, stop) -> bool:
+    """Blocks until there is room for the item, or the parser gave up."""
+    while not stop.is_set():
+        try:
+            sources.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _write_outputs(outputs, output_format, write_errors) -> None:
+    """Writer stage: flushes finished outputs until _DONE is queued.
+
+    After a failed write it keeps draining the queue without writing, so
+    the parser never blocks on a dead writer.
+    """
+    write_mode = 'wb' if FORMATS[output_format].binary else 'w'
+    while True:
+        item = outputs.get()
+        if item is _DONE:
+            return
+        if write_errors:
+            continue
+        output_path, data = item
+        try:
+            with open(output_path, write_mode) as output_file:
+                output_file.write(data)
+        except BaseException as error:  # keep draining, or the parser blocks
+            write_errors.append(error)
 
 
 if "__main__" == __name__:
-    # Parses the input path and calls analyze_file on each input file.
+    # Parses the input path and calls analyze_files on the input files.
     # This opens both the input and the output files!
     # Both are closed automatically when the code finishes running.
     # If the output file does not exist, it is created automatically in the
     # correct path, using the correct filename.
-    if not len(sys.argv) == 2:
-        sys.exit("Invalid usage, please use: JackAnalyzer <input path>")
+    if len(sys.argv) not in (2, 3) or \
+            (len(sys.argv) == 3 and sys.argv[2] not in FORMATS):
+        sys.exit("Invalid usage, please use: JackAnalyzer <input path> "
+                 "[" + "|".join(FORMATS) + "]")
+    output_format = sys.argv[2] if len(sys.argv) == 3 else "xml"
     argument_path = os.path.abspath(sys.argv[1])
     if os.path.isdir(argument_path):  # if a folder
         files_to_assemble = [
@@ -41,11 +162,7 @@ if "__main__" == __name__:
             for filename in os.listdir(argument_path)]
     else:
         files_to_assemble = [argument_path]
-    for input_path in files_to_assemble:
-        filename, extension = os.path.splitext(input_path)
-        if extension.lower() != ".jack":
-            continue
-        output_path = filename + ".xml"
-        with open(input_path, 'r') as input_file, \
-                open(output_path, 'w') as output_file:
-            analyze_file(input_file, output_file)
+    analyze_files(
+        [input_path for input_path in files_to_assemble
+         if os.path.splitext(input_path)[1].lower() == ".jack"],
+        output_format)
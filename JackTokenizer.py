@@ -115,7 +115,9 @@ class JackTokenizer:
         # A good place to start is to read all the lines of the input:
         self.current_token = None
         self.input_lines = input_stream.read().splitlines()
+        self.source_lines = list(self.input_lines)
         self.tokens = []
+        self.token_columns = []
         self.curr_place = -1
         self.token_index = 0
         self.in_comment = False
@@ -166,10 +168,18 @@ class JackTokenizer:
             self.tokens.append(self.token_type(word))
 
     def read_line(self):
-        """get the tokens from the line"""
+        """get the tokens from the line, and their 1-based columns in the
+        original line"""
         self.tokens = []
+        self.token_columns = []
         self.input_lines[self.curr_place] = self.remove_comments_spaces(self.input_lines[self.curr_place])
+        source_line = self.source_lines[self.curr_place]
+        column = 0
         for word in self.split_line():
+            if word:
+                column = max(source_line.find(word, column), column)
+                self.token_columns.append(column + 1)
+                column += len(word)
             self.tokenize_word(word)
         if self.curr_place == len(self.input_lines) - 1:
             self.EOT = True
@@ -216,6 +226,20 @@ class JackTokenizer:
         else:
             return "ERROR", word
 
+    def line_number(self) -> int:
+        """
+        Returns:
+            int: the 1-based line of the current token in the input.
+        """
+        return self.curr_place + 1
+
+    def column(self) -> int:
+        """
+        Returns:
+            int: the 1-based column of the current token in its line.
+        """
+        return self.token_columns[self.token_index]
+
     def keyword(self) -> str:
         """
         Returns:
@@ -0,0 +1,204 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import json
+import re
+import struct
+import typing
+
+
+class XmlWriter:
+    """Writes the parse tree as the indented XML of the course spec."""
+    binary = False
+
+    def __init__(self, output_stream: typing.TextIO) -> None:
+        self.output_stream = output_stream
+        self.tab_num = 0
+
+    def start(self, label) -> None:
+        self.output_stream.write(" " * self.tab_num + "<" + label + ">\n")
+        self.tab_num = +1
+
+    def end(self, label) -> None:
+        self.tab_num = -1
+        self.output_stream.write(" " * self.tab_num + "</" + label + ">\n")
+
+    def token(self, token) -> None:
+        self.output_stream.write(
+            " " * self.tab_num + "<" + token[0] + ">" + token[1] + "</" + token[0] + "> \n")
+
+
+class JsonLinesWriter:
+    """Writes the parse tree as a stream of compact JSON events, one per
+    line: ["s", label] opens a node, ["e", label] closes it and
+    [type, value] is a token.
+    """
+    binary = False
+
+    def __init__(self, output_stream: typing.TextIO) -> None:
+        self.output_stream = output_stream
+
+    def start(self, label) -> None:
+        self.write(["s", label])
+
+    def end(self, label) -> None:
+        self.write(["e", label])
+
+    def token(self, token) -> None:
+        self.write([token[0], token[1]])
+
+    def write(self, event) -> None:
+        self.output_stream.write(json.dumps(event, separators=(",", ":")) + "\n")
+
+
+class BinaryTreeWriter:
+    """Writes the parse tree as a compact length-prefixed binary stream.
+
+    Every record starts with a one byte opcode:
+
+    - LABEL, len (u8), label: defines a label, it gets the next free id.
+    - START, id (u8): opens a node.
+    - END, id (u8): closes a node.
+    - TOKEN, type (u8), len (u16), value: a token, type is an index into
+      TOKEN_TYPES.
+
+    Labels are defined once, right before their first use. Lengths are big
+    endian, strings are utf-8. So a tree may use at most MAX_LABELS labels of
+    at most MAX_LABEL_LENGTH bytes each, and a token value is at most
+    MAX_VALUE_LENGTH bytes; writing anything larger raises ValueError.
+    """
+    binary = True
+
+    LABEL, START, END, TOKEN = 0, 1, 2, 3
+    TOKEN_TYPES = ["keyword", "symbol", "integerConstant", "stringConstant", "identifier", "ERROR"]
+    MAX_LABELS, MAX_LABEL_LENGTH, MAX_VALUE_LENGTH = 256, 255, 65535
+
+    def __init__(self, output_stream: typing.BinaryIO) -> None:
+        self.output_stream = output_stream
+        self.label_ids = {}
+
+    def start(self, label) -> None:
+        self.output_stream.write(struct.pack(">BB", BinaryTreeWriter.START, self.label_id(label)))
+
+    def end(self, label) -> None:
+        self.output_stream.write(struct.pack(">BB", BinaryTreeWriter.END, self.label_id(label)))
+
+    def token(self, token) -> None:
+        encoded = token[1].encode("utf-8")
+        if len(encoded) > BinaryTreeWriter.MAX_VALUE_LENGTH:
+            raise ValueError("token value of " + str(len(encoded)) + " bytes is longer than " +
+                             str(BinaryTreeWriter.MAX_VALUE_LENGTH))
+        self.output_stream.write(
+            struct.pack(">BBH", BinaryTreeWriter.TOKEN, BinaryTreeWriter.TOKEN_TYPES.index(token[0]),
+                        len(encoded)) + encoded)
+
+    def label_id(self, label) -> int:
+        if label not in self.label_ids:
+            encoded = label.encode("utf-8")
+            if len(encoded) > BinaryTreeWriter.MAX_LABEL_LENGTH:
+                raise ValueError("label " + repr(label[:20]) + "... is longer than " +
+                                 str(BinaryTreeWriter.MAX_LABEL_LENGTH) + " bytes")
+            if len(self.label_ids) == BinaryTreeWriter.MAX_LABELS:
+                raise ValueError("more than " + str(BinaryTreeWriter.MAX_LABELS) + " labels")
+            self.label_ids[label] = len(self.label_ids)
+            self.output_stream.write(struct.pack(">BB", BinaryTreeWriter.LABEL, len(encoded)) + encoded)
+        return self.label_ids[label]
+
+
+FORMATS = {"xml": XmlWriter, "jsonl": JsonLinesWriter, "bin": BinaryTreeWriter}
+
+# Readers turn every format back into the same stream of events:
+# ("start", label), ("end", label) and ("token", (type, value)).
+
+XML_TOKEN = re.compile(r"^\s*<(\w+)>(.*)</\1>\s*$")
+XML_END = re.compile(r"^\s*</(\w+)>\s*$")
+XML_START = re.compile(r"^\s*<(\w+)>\s*$")
+
+
+def read_xml(input_stream: typing.TextIO) -> typing.Iterator[tuple]:
+    """Reads events back from the output of XmlWriter.
+
+    Args:
+        input_stream (typing.TextIO): xml written by XmlWriter.
+    """
+    for line in input_stream:
+        match = XML_TOKEN.match(line)
+        if match:
+            yield "token", (match.group(1), match.group(2))
+            continue
+        match = XML_END.match(line)
+        if match:
+            yield "end", match.group(1)
+            continue
+        match = XML_START.match(line)
+        if match:
+            yield "start", match.group(1)
+        elif line.strip():
+            raise ValueError("bad xml line: " + line)
+
+
+def read_json_lines(input_stream: typing.TextIO) -> typing.Iterator[tuple]:
+    """Reads events back from the output of JsonLinesWriter.
+
+    Args:
+        input_stream (typing.TextIO): json lines written by JsonLinesWriter.
+    """
+    for line in input_stream:
+        if not line.strip():
+            continue
+        kind, value = json.loads(line)
+        if kind == "s":
+            yield "start", value
+        elif kind == "e":
+            yield "end", value
+        else:
+            yield "token", (kind, value)
+
+
+def read_binary_tree(input_stream: typing.BinaryIO) -> typing.Iterator[tuple]:
+    """Reads events back from the output of BinaryTreeWriter.
+
+    Args:
+        input_stream (typing.BinaryIO): bytes written by BinaryTreeWriter.
+
+    Raises:
+        ValueError: if the stream is truncated or corrupt.
+    """
+    data = input_stream.read()
+    labels = []
+    index = 0
+    while index < len(data):
+        opcode = data[index]
+        if opcode == BinaryTreeWriter.LABEL:
+            length = _binary_field(data, index + 1, 1)[0]
+            labels.append(_binary_field(data, index + 2, length).decode("utf-8"))
+            index += 2 + length
+        elif opcode in (BinaryTreeWriter.START, BinaryTreeWriter.END):
+            label_id = _binary_field(data, index + 1, 1)[0]
+            if label_id >= len(labels):
+                raise ValueError("undefined label " + str(label_id) + " at " + str(index))
+            yield "start" if opcode == BinaryTreeWriter.START else "end", labels[label_id]
+            index += 2
+        elif opcode == BinaryTreeWriter.TOKEN:
+            token_type, length = struct.unpack(">BH", _binary_field(data, index + 1, 3))
+            if token_type >= len(BinaryTreeWriter.TOKEN_TYPES):
+                raise ValueError("bad token type " + str(token_type) + " at " + str(index))
+            value = _binary_field(data, index + 4, length).decode("utf-8")
+            yield "token", (BinaryTreeWriter.TOKEN_TYPES[token_type], value)
+            index += 4 + length
+        else:
+            raise ValueError("bad opcode " + str(opcode) + " at " + str(index))
+
+
+def _binary_field(data, index, length) -> bytes:
+    """Returns length bytes of data from index, which must all be there."""
+    if index + length > len(data):
+        raise ValueError("truncated binary tree at " + str(index))
+    return data[index:index + length]
+
+
+READERS = {"xml": read_xml, "jsonl": read_json_lines, "bin": read_binary_tree}
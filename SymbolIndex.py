@@ -0,0 +1,285 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import json
+import os
+import sys
+import typing
+from JackTokenizer import JackTokenizer
+
+
+class SymbolIndex:
+    """Keeps an index of the definitions and references of all the Jack
+    classes in a directory, saved next to them in INDEX_FILENAME.
+
+    Definitions are classes, statics, fields and subroutines, named
+    "Class" or "Class.member". References are call sites, uses of class
+    names as types, and uses of statics and fields inside subroutines. Call
+    targets are resolved through the declared types of locals, arguments,
+    fields and statics, so "do a.dispose()" with "var Array a" is a call to
+    "Array.dispose". Every entry has the file, line and column it was found
+    at.
+
+    update() only re-reads files whose size or modification time changed
+    since they were last indexed.
+    """
+    INDEX_FILENAME = ".jackindex.json"
+    VERSION = 1
+
+    # Classes of the Jack OS, their subroutines are never in the directory.
+    OS_CLASSES = {"Math", "String", "Array", "Output", "Screen", "Keyboard", "Memory", "Sys"}
+
+    def __init__(self, directory: str) -> None:
+        """Loads the saved index of the directory, if there is one. An index
+        that cannot be read is ignored, and rebuilt by the next update().
+
+        Args:
+            directory (str): the directory of the .jack files.
+        """
+        self.directory = os.path.abspath(directory)
+        self.index_path = os.path.join(self.directory, SymbolIndex.INDEX_FILENAME)
+        self.files = {}
+        try:
+            with open(self.index_path, 'r') as index_file:
+                saved = json.load(index_file)
+            if saved.get("version") == SymbolIndex.VERSION:
+                self.files = dict(saved["files"])
+            self.build_lookups()
+        except (OSError, ValueError, AttributeError, KeyError, TypeError):
+            self.files = {}
+            self.build_lookups()
+
+    def update(self) -> typing.List[str]:
+        """Re-indexes the files that were added or changed, forgets the
+        removed ones and saves the index.
+
+        Returns:
+            typing.List[str]: the files that were (re-)indexed.
+        """
+        jack_files = sorted(filename for filename in os.listdir(self.directory)
+                            if os.path.splitext(filename)[1].lower() == ".jack")
+        changed = []
+        for filename in jack_files:
+            stat = os.stat(os.path.join(self.directory, filename))
+            entry = self.files.get(filename)
+            if entry and entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                continue
+            entry = {"mtime": stat.st_mtime_ns, "size": stat.st_size,
+                     "definitions": [], "references": []}
+            try:
+                with open(os.path.join(self.directory, filename), 'r') as input_file:
+                    entry["definitions"], entry["references"] = index_file(input_file, filename)
+            except (OSError, ValueError, IndexError) as error:  # e.g. not utf-8
+                entry["failed"] = str(error)
+            self.files[filename] = entry
+            changed.append(filename)
+        removed = set(self.files) - set(jack_files)
+        for filename in removed:
+            del self.files[filename]
+        if changed or removed or not os.path.isfile(self.index_path):
+            self.build_lookups()
+            self.save()
+        return changed
+
+    def save(self) -> None:
+        """Writes the index next to the old one and then replaces it, so an
+        interrupted save never leaves a half-written index behind."""
+        temporary_path = self.index_path + ".tmp"
+        with open(temporary_path, 'w') as index_file:
+            json.dump({"version": SymbolIndex.VERSION, "files": self.files}, index_file)
+        os.replace(temporary_path, self.index_path)
+
+    def build_lookups(self) -> None:
+        self.definitions_by_name = {}
+        self.references_by_name = {}
+        for entry in self.files.values():
+            for definition in entry["definitions"]:
+                self.definitions_by_name.setdefault(definition["name"], []).append(definition)
+            for reference in entry["references"]:
+                self.references_by_name.setdefault(reference["name"], []).append(reference)
+
+    def definition(self, name: str) -> typing.List[dict]:
+        """
+        Args:
+            name (str): "Class" or "Class.member".
+
+        Returns:
+            typing.List[dict]: where the name is defined, normally at most
+            one place.
+        """
+        return self.definitions_by_name.get(name, [])
+
+    def references(self, name: str) -> typing.List[dict]:
+        """
+        Args:
+            name (str): "Class" or "Class.member".
+
+        Returns:
+            typing.List[dict]: every reference to the name.
+        """
+        return self.references_by_name.get(name, [])
+
+    def callers(self, name: str) -> typing.List[dict]:
+        """
+        Args:
+            name (str): a subroutine, as "Class.subroutine".
+
+        Returns:
+            typing.List[dict]: the call sites of the subroutine, the calling
+            subroutine is in their "caller" key.
+        """
+        return [reference for reference in self.references(name) if reference["kind"] == "call"]
+
+    def failed_files(self) -> typing.Dict[str, str]:
+        """
+        Returns:
+            typing.Dict[str, str]: the files that could not be indexed, and
+            why. They are retried once they change.
+        """
+        return {filename: entry["failed"] for filename, entry in self.files.items() if "failed" in entry}
+
+    def unresolved_calls(self) -> typing.List[dict]:
+        """
+        Returns:
+            typing.List[dict]: the call sites whose target is not defined in
+            the directory, calls to the Jack OS excluded.
+        """
+        return [reference
+                for name, references in sorted(self.references_by_name.items())
+                if name not in self.definitions_by_name
+                and name.split(".")[0] not in SymbolIndex.OS_CLASSES
+                for reference in references if reference["kind"] == "call"]
+
+
+def index_file(input_file: typing.TextIO, filename: str) -> typing.Tuple[list, list]:
+    """Finds the definitions and references of a single file.
+
+    Only the declarations and the identifiers around them are looked at, so
+    this does not need the file to parse.
+
+    Args:
+        input_file (typing.TextIO): the file to index.
+        filename (str): recorded as the file of every entry.
+
+    Returns:
+        typing.Tuple[list, list]: the definitions and the references.
+    """
+    tokens = list(positioned_tokens(JackTokenizer(input_file)))
+    definitions = []
+    references = []
+    class_name = None
+    class_vars = {}  # name -> type, statics and fields
+    local_vars = {}  # name -> type, arguments and vars
+    subroutine = None
+
+    def add(entries, name, kind, token, **extra):
+        entries.append(dict(name=name, kind=kind, file=filename, line=token[2], col=token[3], **extra))
+
+    def add_type(token):
+        if token[0] == 'identifier':
+            add(references, token[1], "type", token, caller=subroutine or class_name)
+
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        previous = tokens[index - 1][1] if index else None
+        following = tokens[index + 1][1] if index + 1 < len(tokens) else None
+        if token[1] == 'class' and index + 1 < len(tokens) and tokens[index + 1][0] == 'identifier':
+            class_name = following
+            add(definitions, class_name, "class", tokens[index + 1])
+            index += 2
+        elif token[1] in ('static', 'field') and previous in ('{', ';', '}') and class_name \
+                and index + 1 < len(tokens):
+            var_type = tokens[index + 1]
+            add_type(var_type)
+            index += 2
+            while index < len(tokens) and tokens[index][1] != ';':
+                if tokens[index][0] == 'identifier':
+                    class_vars[tokens[index][1]] = var_type[1]
+                    add(definitions, class_name + "." + tokens[index][1], token[1], tokens[index],
+                        type=var_type[1])
+                index += 1
+        elif token[1] in ('constructor', 'function', 'method') and class_name and index + 3 < len(tokens):
+            return_type, name = tokens[index + 1], tokens[index + 2]
+            add_type(return_type)
+            subroutine = class_name + "." + name[1]
+            local_vars = {}
+            parameters = []
+            index += 4  # past the "("
+            while index + 1 < len(tokens) and tokens[index][1] != ')':
+                if tokens[index][1] != ',':
+                    add_type(tokens[index])
+                    parameters.append([tokens[index][1], tokens[index + 1][1]])
+                    local_vars[tokens[index + 1][1]] = tokens[index][1]
+                    index += 1
+                index += 1
+            add(definitions, subroutine, token[1], name, type=return_type[1], parameters=parameters)
+        elif token[1] == 'var' and index + 1 < len(tokens):
+            var_type = tokens[index + 1]
+            add_type(var_type)
+            index += 2
+            while index < len(tokens) and tokens[index][1] != ';':
+                if tokens[index][0] == 'identifier':
+                    local_vars[tokens[index][1]] = var_type[1]
+                index += 1
+        elif token[0] == 'identifier' and subroutine and previous != '.':
+            if following == '.' and index + 2 < len(tokens):
+                qualifier = token[1]
+                if qualifier in local_vars or qualifier in class_vars:
+                    if qualifier not in local_vars:
+                        add(references, class_name + "." + qualifier, "variable", token, caller=subroutine)
+                    qualifier = local_vars.get(qualifier, class_vars.get(qualifier))
+                else:
+                    add(references, qualifier, "type", token, caller=subroutine)
+                add(references, qualifier + "." + tokens[index + 2][1], "call", tokens[index + 2],
+                    caller=subroutine)
+                index += 2
+            elif following == '(':
+                add(references, class_name + "." + token[1], "call", token, caller=subroutine)
+            elif token[1] in class_vars and token[1] not in local_vars:
+                add(references, class_name + "." + token[1], "variable", token, caller=subroutine)
+        index += 1
+    return definitions, references
+
+
+def positioned_tokens(tokenizer: JackTokenizer) -> typing.Iterator[tuple]:
+    """Yields every token of the tokenizer as (type, value, line, column)."""
+    while tokenizer.token_index + 1 < len(tokenizer.tokens) or tokenizer.has_more_tokens():
+        tokenizer.advance()
+        if tokenizer.tokens:
+            yield tokenizer.tokens[tokenizer.token_index] + (tokenizer.line_number(), tokenizer.column())
+
+
+def location(entry: dict) -> str:
+    """Returns the position of an index entry as file:line:col."""
+    return entry["file"] + ":" + str(entry["line"]) + ":" + str(entry["col"])
+
+
+if "__main__" == __name__:
+    # Updates the index of the given directory, then answers the query:
+    # definition <name>, callers <Class.subroutine> or unresolved.
+    queries = {"definition": 1, "callers": 1, "unresolved": 0}
+    if len(sys.argv) < 2 or not os.path.isdir(sys.argv[1]) or \
+            (len(sys.argv) > 2 and queries.get(sys.argv[2]) != len(sys.argv) - 3):
+        sys.exit("Invalid usage, please use: SymbolIndex <directory> "
+                 "[definition <name> | callers <Class.subroutine> | unresolved]")
+    symbol_index = SymbolIndex(sys.argv[1])
+    symbol_index.update()
+    if len(sys.argv) == 2:
+        print(str(len(symbol_index.files)) + " files, " + str(len(symbol_index.definitions_by_name)) +
+              " definitions")
+        for filename, error in symbol_index.failed_files().items():
+            print(filename + ": not indexed, " + error)
+    elif sys.argv[2] == "definition":
+        for entry in symbol_index.definition(sys.argv[3]):
+            print(location(entry) + " " + entry["kind"] + " " + entry["name"])
+    elif sys.argv[2] == "callers":
+        for entry in symbol_index.callers(sys.argv[3]):
+            print(location(entry) + " " + entry["caller"])
+    else:
+        for entry in symbol_index.unresolved_calls():
+            print(location(entry) + " " + entry["name"] + " in " + entry["caller"])
@@ -0,0 +1,87 @@
+import os
+import threading
+
+import pytest
+
+from JackAnalyzer import analyze_files
+from OutputFormats import FORMATS, READERS
+
+VALID = "class {0} {{\n    function void run() {{\n        return;\n    }}\n}}\n"
+BROKEN = "class Broken {\n    function void run() {\n        let x = 1;\n        return;\n    }\n}\n"
+
+
+def with_timeout(function, *args, **kwargs):
+    """Runs function in a thread, failing the test instead of hanging."""
+    result = []
+
+    def target():
+        try:
+            function(*args, **kwargs)
+            result.append(None)
+        except BaseException as error:
+            result.append(error)
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(10)
+    assert not thread.is_alive(), "analyze_files hung"
+    if result[0] is not None:
+        raise result[0]
+
+
+def write_sources(tmp_path, names, broken=()):
+    paths = []
+    for name in names:
+        path = tmp_path / (name + ".jack")
+        path.write_text(BROKEN if name in broken else VALID.format(name))
+        paths.append(str(path))
+    return paths
+
+
+@pytest.mark.parametrize("output_format", list(FORMATS))
+def test_writes_every_output(tmp_path, output_format):
+    names = ["A", "B", "C", "D", "E"]
+    with_timeout(analyze_files, write_sources(tmp_path, names), output_format, depth=1)
+    for name in names:
+        path = tmp_path / (name + "." + output_format)
+        with open(path, 'rb' if FORMATS[output_format].binary else 'r') as output_file:
+            events = list(READERS[output_format](output_file))
+        assert events[2] == ("token", ("identifier", name))
+
+
+def test_missing_source_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        with_timeout(analyze_files, [str(tmp_path / "Missing.jack")])
+
+
+def test_undecodable_source_raises(tmp_path):
+    (tmp_path / "C.jack").write_bytes(b"class C { \xff\xfe }")
+    with pytest.raises(UnicodeDecodeError):
+        with_timeout(analyze_files, write_sources(tmp_path, ["A"]) + [str(tmp_path / "C.jack")])
+    assert (tmp_path / "A.xml").exists()
+
+
+def test_parse_error_stops_after_partial_output(tmp_path):
+    paths = write_sources(tmp_path, ["A", "Broken", "C", "D"], broken=["Broken"])
+    with pytest.raises(ValueError):
+        with_timeout(analyze_files, paths, depth=1)
+    assert (tmp_path / "A.xml").exists()
+    assert (tmp_path / "Broken.xml").read_text().startswith("<class>")
+    assert not (tmp_path / "C.xml").exists()
+    assert not (tmp_path / "D.xml").exists()
+
+
+def test_write_error_raises(tmp_path):
+    paths = write_sources(tmp_path, ["A", "B", "C", "D", "E", "F", "G"])
+    os.mkdir(tmp_path / "B.xml")
+    with pytest.raises(OSError):
+        with_timeout(analyze_files, paths, depth=1)
+    assert (tmp_path / "A.xml").exists()
+    assert not (tmp_path / "G.xml").exists()
+
+
+def test_bad_arguments_raise():
+    with pytest.raises(ValueError):
+        analyze_files([], depth=0)
+    with pytest.raises(ValueError):
+        analyze_files([], "yaml")
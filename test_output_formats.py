@@ -0,0 +1,63 @@
+import io
+
+import pytest
+
+from JackAnalyzer import analyze_file
+from OutputFormats import FORMATS, READERS, BinaryTreeWriter, read_xml
+
+SOURCE = """class Point {
+    field int x, y;
+    constructor Point new() {
+        return;
+    }
+    method void print() {
+        return;
+    }
+}
+"""
+
+
+def analyze(output_format):
+    output = io.BytesIO() if FORMATS[output_format].binary else io.StringIO()
+    analyze_file(io.StringIO(SOURCE), output, output_format)
+    return output.getvalue()
+
+
+def read(output_format, data):
+    stream = io.BytesIO(data) if FORMATS[output_format].binary else io.StringIO(data)
+    return list(READERS[output_format](stream))
+
+
+@pytest.mark.parametrize("output_format", ["jsonl", "bin"])
+def test_round_trip_matches_xml(output_format):
+    expected = list(read_xml(io.StringIO(analyze("xml"))))
+    assert expected[0] == ("start", "class")
+    assert read(output_format, analyze(output_format)) == expected
+
+
+@pytest.mark.parametrize("output_format", ["jsonl", "bin"])
+def test_smaller_than_xml(output_format):
+    assert len(analyze(output_format)) < len(analyze("xml"))
+
+
+def test_truncated_binary_raises():
+    data = analyze("bin")
+    with pytest.raises(ValueError):
+        read("bin", data[:-1])
+    for length in range(1, len(data)):
+        try:
+            read("bin", data[:length])
+        except ValueError:  # the only error a cut stream may give
+            pass
+
+
+def test_binary_limits_raise():
+    writer = BinaryTreeWriter(io.BytesIO())
+    with pytest.raises(ValueError):
+        writer.token(("stringConstant", "x" * (BinaryTreeWriter.MAX_VALUE_LENGTH + 1)))
+    with pytest.raises(ValueError):
+        writer.start("x" * (BinaryTreeWriter.MAX_LABEL_LENGTH + 1))
+    for label_id in range(BinaryTreeWriter.MAX_LABELS):
+        writer.start("label" + str(label_id))
+    with pytest.raises(ValueError):
+        writer.start("one too many")
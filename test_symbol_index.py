@@ -0,0 +1,73 @@
+import pytest
+
+from SymbolIndex import SymbolIndex
+
+FOO = """class Foo {
+    field Bar bar;
+    method void run() {
+        var Array items;
+        do bar.go();
+        do items.dispose();
+        do Missing.thing();
+        return;
+    }
+}
+"""
+
+BAR = """class Bar {
+    method void go() {
+        do Foo.run();
+        return;
+    }
+}
+"""
+
+
+def make_index(tmp_path):
+    (tmp_path / "Foo.jack").write_text(FOO)
+    (tmp_path / "Bar.jack").write_text(BAR)
+    symbol_index = SymbolIndex(str(tmp_path))
+    return symbol_index, symbol_index.update()
+
+
+def test_queries(tmp_path):
+    symbol_index, changed = make_index(tmp_path)
+    assert changed == ["Bar.jack", "Foo.jack"]
+    [definition] = symbol_index.definition("Bar.go")
+    assert (definition["kind"], definition["file"], definition["line"], definition["col"]) == \
+        ("method", "Bar.jack", 2, 17)
+    assert [(caller["file"], caller["line"], caller["caller"])
+            for caller in symbol_index.callers("Bar.go")] == [("Foo.jack", 5, "Foo.run")]
+    assert [call["name"] for call in symbol_index.unresolved_calls()] == ["Missing.thing"]
+
+
+def test_update_is_incremental(tmp_path):
+    make_index(tmp_path)
+    symbol_index = SymbolIndex(str(tmp_path))
+    assert symbol_index.update() == []
+    assert symbol_index.definition("Foo.run")
+
+
+def test_broken_files_do_not_stop_update(tmp_path):
+    (tmp_path / "Half.jack").write_text("class Half { var")
+    (tmp_path / "Bad.jack").write_bytes(b"class Bad { \xff\xfe }")
+    symbol_index, changed = make_index(tmp_path)
+    assert changed == ["Bad.jack", "Bar.jack", "Foo.jack", "Half.jack"]
+    assert SymbolIndex(str(tmp_path)).update() == []
+    assert symbol_index.definition("Half")
+    assert list(symbol_index.failed_files()) == ["Bad.jack"]
+    assert symbol_index.callers("Foo.run")
+
+
+@pytest.mark.parametrize("saved", [
+    '{"version": 1, "fil',
+    '[]',
+    '{"version": 1, "files": {"Foo.jack": {}}}',
+    '{"version": 1, "files": {"Foo.jack": {"definitions": [{}], "references": []}}}',
+])
+def test_corrupt_index_is_rebuilt(tmp_path, saved):
+    make_index(tmp_path)
+    (tmp_path / SymbolIndex.INDEX_FILENAME).write_text(saved)
+    symbol_index = SymbolIndex(str(tmp_path))
+    assert symbol_index.update() == ["Bar.jack", "Foo.jack"]
+    assert SymbolIndex(str(tmp_path)).definition("Foo.run")